@@ -6,173 +6,370 @@
 #
 # For n non-collinear foci the resulting curve is a smooth combination of up to 2*n ellipse fragments.
 
-
-import math
-import svgwrite
-import re
 import os
 import numpy as np
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from math import sqrt, hypot, sin, atan2, degrees
+
+try:
+    from numba import njit
+except ImportError:             # numba is optional: without it the kernels run as plain Python
+    def njit(*args, **kwargs):
+        def passthrough(func):
+            return func
+        return passthrough(args[0]) if (args and callable(args[0])) else passthrough
+
+class ColouredPoint:
+    "A 2D point that has both coordinates and colour; indexable and iterable like the coordinate pair"
+
+    __slots__ = ('x', 'y', 'colour')
 
-class ColouredPoint(np.ndarray):
-    "A (numpy) point that has both coordinates and colour"
+    def __init__(self, input_array, colour='grey'):
+        (self.x, self.y)    = (float(input_array[0]), float(input_array[1]))
+        self.colour         = colour
 
-    def __new__(cls, input_array, colour='grey'):
-        coloured_point = np.asarray(input_array).view(cls)
-        coloured_point.colour = colour
-        return coloured_point
+    def __getitem__(self, index):
+        return (self.x, self.y)[index]
 
-    def __array_finalize__(self, coloured_point):
-        if coloured_point is None: return
-        self.info = getattr(coloured_point, 'colour', None)
+    def __iter__(self):
+        return iter( (self.x, self.y) )
+
+    def __len__(self):
+        return 2
 
 def distance(P1, P2):
     "Find Euclidean distance between two points"
-    return np.linalg.norm(P2-P1)
+    return hypot(P2[0]-P1[0], P2[1]-P1[1])
 
 def three_point_cosine(P1, P0, P2):
     "Find cosine of the angle between P1-P0 and P2-P0 (note the order of args)"
-    return np.dot(P1-P0, P2-P0)/(distance(P1,P0)*distance(P2,P0))
+    dx1 = P1[0]-P0[0]
+    dy1 = P1[1]-P0[1]
+    dx2 = P2[0]-P0[0]
+    dy2 = P2[1]-P0[1]
+    return (dx1*dx2 + dy1*dy2) / sqrt( (dx1*dx1 + dy1*dy1) * (dx2*dx2 + dy2*dy2) )
 
 def clockwiseness_of_points(P1, P2, P3):
     "Detect whether the points are ordered clockwise (1), collinear (0) or counter-clockwise(-1)"
-    return  np.sign(np.linalg.norm(np.cross(P2-P1,P3-P1)))
+    v   = (P2[0]-P1[0])*(P3[1]-P1[1]) - (P2[1]-P1[1])*(P3[0]-P1[0])
+    return (v > 0) - (v < 0)
 
 def rintvec(vector):
     "By-component rounding of a vector"
     return map(int, map(round, vector))
 
-def turn_and_scale(Z, D, cos_f, rho):
+@njit(cache=True)
+def _turn_and_scale_kernel(Zx, Zy, Ux, Uy, cos_f, sin_f, rho):
+    "Scalar core of turn_and_scale, on plain floats so that numba can compile it"
+
+    return ( rho * ( Ux*cos_f + Uy*sin_f) + Zx,
+             rho * (-Ux*sin_f + Uy*cos_f) + Zy )
+
+@njit(cache=True)
+def _both_limits_kernel(F1x, F1y, F2x, F2y, Ux, Uy, a, b2, c, cos_B, sin_B, cos_A2, sin_A2):
+    "Fused evaluation of both right-limit candidates, entirely on plain floats for numba"
+
+    den_B   = a + c*cos_B
+    den_A2  = a - c*cos_A2
+        # vanishing denominators only happen for degenerate (zero-slack) ellipses, where rho tends to the vertex distance a+c:
+    rho_B   = b2/den_B  if den_B  > 1e-9 else a + c
+    rho_A2  = b2/den_A2 if den_A2 > 1e-9 else a + c
+    (Bx,  By)   = _turn_and_scale_kernel( F2x, F2y, -Ux, -Uy, cos_B,  sin_B,  -rho_B )
+    (A2x, A2y)  = _turn_and_scale_kernel( F1x, F1y,  Ux,  Uy, cos_A2, sin_A2,  rho_A2 )
+    return (Bx, By, A2x, A2y)
+
+def turn_and_scale(Z, D, cos_f, rho, sin_f=None):
     "Relative to centre Z and axis ZD, find the point A in polar coordinates (phi,rho) and map it to Cartesian"
 
-    sin_f       = math.sqrt(abs(1.0 - cos_f**2))    # abs() is needed in the rarest of cases when cos_f *seems* to go over 1.0
-    U           = (D-Z)/distance(Z, D)              # unit vector in the original direction relative to Z
-    A           = rho * np.dot(U , [[cos_f, -sin_f], [sin_f, cos_f]]) + Z
-    return A
+    if sin_f is None:
+        sin_f   = sqrt(abs(1.0 - cos_f*cos_f))      # abs() is needed in the rarest of cases when cos_f *seems* to go over 1.0
+    ZD_length   = distance(Z, D)
+    return _turn_and_scale_kernel( Z[0], Z[1], (D[0]-Z[0])/ZD_length, (D[1]-Z[1])/ZD_length, cos_f, sin_f, rho )
 
 class Ellipse:
     "Computes and stores parameters of the ellipse and provides some helper geometry methods"
 
-    def __init__(self, F1, F2, d):
+    __slots__ = ('F1', 'F2', 'F1x', 'F1y', 'F2x', 'F2y', 'c', 'a', 'b', 'b2', '_tilt_deg', 'Ux', 'Uy')
+
+    def __init__(self, F1, F2, d, c=None, tilt_deg=None, unit=None):
         self.F1 = F1
         self.F2 = F2
-        self.c  = distance(F1, F2)/2
+            # plain-float focus coordinates, unpacked once instead of indexing the point objects per call:
+        (self.F1x, self.F1y) = (float(F1[0]), float(F1[1]))
+        (self.F2x, self.F2y) = (float(F2[0]), float(F2[1]))
+        self.c  = distance(F1, F2)/2 if c is None else c
         self.a  = d/2
-        self.b  = math.sqrt( self.a**2 - self.c**2 )
-
-    def point_on_the_ellipse(self, cos_f, focus_sign=-1):
+        self.b2 = max(0.0, (self.a - self.c) * (self.a + self.c))   # stabler than a**2 - c**2; clamped for zero-slack degenerates
+        self.b  = sqrt( self.b2 )
+        self._tilt_deg = tilt_deg   # if not supplied, computed lazily: bootstrap candidates never need it
+        if unit is None:
+            ZD_length   = 2 * self.c
+            unit        = ( (F2[0]-F1[0]) / ZD_length, (F2[1]-F1[1]) / ZD_length )
+        (self.Ux, self.Uy) = (unit[0], unit[1])     # unit vector of the F1->F2 axis
+
+    def point_on_the_ellipse(self, cos_f, focus_sign=-1, sin_f=None):
         "Return a Cartesian point on the ellipse given polar cosine; focus_sign==-1|1 means relative to first|second focus"
 
-        rho     = self.b**2 / (self.a + focus_sign * self.c * cos_f)
-        (Z, D)  = (self.F1, self.F2) if focus_sign==-1 else (self.F2, self.F1)
-        return turn_and_scale(Z, D, cos_f, -focus_sign*rho)
+        if sin_f is None:
+            sin_f   = sqrt(abs(1.0 - cos_f*cos_f))
+        denominator = self.a + focus_sign * self.c * cos_f
+            # the denominator only vanishes for a degenerate (zero-slack) ellipse at cos_f=1, where rho tends to the vertex distance a+c:
+        rho     = self.b2 / denominator if denominator > 1e-9 else self.a + self.c
+        if focus_sign == -1:
+            return _turn_and_scale_kernel( self.F1x, self.F1y,  self.Ux,  self.Uy, cos_f, sin_f,  rho )
+        else:
+            return _turn_and_scale_kernel( self.F2x, self.F2y, -self.Ux, -self.Uy, cos_f, sin_f, -rho )
+
+    def both_limits(self, cos_for_B, cos_for_A2, sin_for_B=None, sin_for_A2=None):
+        "Return both right-limit candidates (relative to the second and first focus) in one call, sharing the axis unit vector"
+
+        if sin_for_B is None:
+            sin_for_B   = sqrt(abs(1.0 - cos_for_B*cos_for_B))
+        if sin_for_A2 is None:
+            sin_for_A2  = sqrt(abs(1.0 - cos_for_A2*cos_for_A2))
+        (Bx, By, A2x, A2y) = _both_limits_kernel( self.F1x, self.F1y, self.F2x, self.F2y,
+                                                  self.Ux, self.Uy, self.a, self.b2, self.c,
+                                                  cos_for_B, sin_for_B, cos_for_A2, sin_for_A2 )
+        return ((Bx, By), (A2x, A2y))
 
     def tilt_deg(self):
-        "Return the tilt of the ellipse in degrees"
+        "Return the tilt of the ellipse in degrees (cached, as the foci never move)"
 
-        diff = self.F2-self.F1
-        return math.degrees( math.atan2(diff[1], diff[0]) )
+        if self._tilt_deg is None:
+            self._tilt_deg = degrees( atan2(self.F2y-self.F1y, self.F2x-self.F1x) )
+        return self._tilt_deg
 
-    def draw_ellipse_fragment( self, dwg, A, B, tick_parent, show_leftovers=False ):
+    def draw_ellipse_fragment( self, canvas, A, B, tick_parent, show_leftovers=False, striped=True ):
         "Draw an ellipse fragment given two limits"
 
+            # the two-tone stripe effect needs two overlapping dashed paths per arc; when it is switched
+            # off (or both foci share a colour anyway) a single solid path carries the same geometry:
+        if striped and self.F1.colour != self.F2.colour:
+            visible_stripes     = ( (10, self.F1.colour), (0, self.F2.colour) )
+            visible_dasharray   = '10,10'
+            leftover_stripes    = ( (0, self.F1.colour), (10, self.F2.colour) )
+            leftover_dasharray  = '5,15'
+        else:
+            visible_stripes     = ( (0, self.F1.colour), )
+            visible_dasharray   = 'none'
+            leftover_stripes    = ( (0, self.F1.colour), )
+            leftover_dasharray  = 'none'
+
+            # with zero slack the ellipse degenerates into its focal segment - draw a straight line instead of a collapsed arc:
+        if self.a - self.c < 1e-9:
+            segment_d   = canvas.fmt_line_d % (A[0], A[1], B[0], B[1])
+            for (stripe_dashoffset, stripe_colour) in visible_stripes:
+                canvas.arc_buckets[(stripe_colour, 6, stripe_dashoffset, visible_dasharray)].append( segment_d )
+            return
+
         tilt_deg        = self.tilt_deg()
 
-            # visible part of the component ellipse:
-        for (stripe_dashoffset, stripe_colour) in ( (10, self.F1.colour), (0, self.F2.colour) ):
-            dwg.add( dwg.path( d="M %f,%f A %f,%f %f 0,1 %f,%f" % (A[0], A[1], self.a, self.b, tilt_deg, B[0], B[1]), stroke=stripe_colour, stroke_width=6, stroke_dashoffset=stripe_dashoffset, stroke_dasharray='10,10', fill='none') )
+            # visible part of the component ellipse; both colour stripes trace the same arc,
+            # so format the d-fragment once and share the string between the two buckets:
+        visible_arc_d   = canvas.fmt_arc_d % (A[0], A[1], self.a, self.b, tilt_deg, '0,1', B[0], B[1])
+        for (stripe_dashoffset, stripe_colour) in visible_stripes:
+            canvas.arc_buckets[(stripe_colour, 6, stripe_dashoffset, visible_dasharray)].append( visible_arc_d )
 
             # remaining, invisible part of the component ellipse:
         if show_leftovers:
-            for (stripe_dashoffset, stripe_colour) in ( (0, self.F1.colour), (10, self.F2.colour) ):
-                dwg.add( dwg.path( d="M %f,%f A %f,%f %f 1,0 %f,%f" % (A[0], A[1], self.a, self.b, tilt_deg, B[0], B[1]), stroke=stripe_colour, stroke_width=2, stroke_dashoffset=stripe_dashoffset, stroke_dasharray='5,15', fill='none') )
-
-        if tick_parent is not None:
-            from_tick   = turn_and_scale(B, tick_parent, 1,  10)
-            to_tick     = turn_and_scale(B, tick_parent, 1, -10)
-            dwg.add( dwg.line( start=rintvec(from_tick), end=rintvec(to_tick), stroke=tick_parent.colour, fill=tick_parent.colour, stroke_width=6, stroke_linecap='round' ) )
-
-    def draw_a_pencil_mark( self, dwg, A, B, pencil_mark_fraction ):
+            leftover_arc_d  = canvas.fmt_arc_d % (A[0], A[1], self.a, self.b, tilt_deg, '1,0', B[0], B[1])
+            for (stripe_dashoffset, stripe_colour) in leftover_stripes:
+                canvas.arc_buckets[(stripe_colour, 2, stripe_dashoffset, leftover_dasharray)].append( leftover_arc_d )
+
+            # at zero slack the limit B can land exactly on its parent focus, leaving the tick without a direction:
+        if tick_parent is not None and abs(B[0]-tick_parent[0]) + abs(B[1]-tick_parent[1]) > 1e-9:
+                # with cos_f=1 the turn is an identity, so both tick ends are just B shifted
+                # along the B->parent direction - one hypot serves both instead of two full turns:
+            dx  = tick_parent[0] - B[0]
+            dy  = tick_parent[1] - B[1]
+            L   = hypot(dx, dy)
+            sx  = 10 * (dx / L)
+            sy  = 10 * (dy / L)
+            (x1, y1)    = rintvec( (B[0] + sx, B[1] + sy) )
+            (x2, y2)    = rintvec( (B[0] - sx, B[1] - sy) )
+            canvas.svg_overlays.append( f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" stroke="{tick_parent.colour}" fill="{tick_parent.colour}" stroke-width="6" stroke-linecap="round" />' )
+
+    def draw_a_pencil_mark( self, canvas, A, B, pencil_mark_fraction ):
         "Draw a pencil mark given a fraction 0..1 that defines the convex combination"
 
-            # find the angles relative to ellipse.F1 in local coordinates:
-        gamma   = math.acos( three_point_cosine(self.F2, self.F1, A) )
-        delta   = math.acos( three_point_cosine(self.F2, self.F1, B) )
-            # now we can create any convex combination and map it onto the corresponding ellipse fragment:
-        mix     = gamma * (1-pencil_mark_fraction) + delta * pencil_mark_fraction
-        M       = self.point_on_the_ellipse( math.cos( mix ) )
-
-        dwg.add( dwg.circle( center=M, r=5,     stroke='blue', stroke_width=1, fill='none' ) )    # "mix" tick mark
-        dwg.add( dwg.line( start=rintvec(self.F1.tolist()), end=rintvec(M), stroke='blue', stroke_width=1  ) )
-        dwg.add( dwg.line( start=rintvec(self.F2.tolist()), end=rintvec(M), stroke='blue', stroke_width=1  ) )
+            # slerp the F1->A and F1->B unit directions instead of converting both to angles and back -
+            # one atan2 and two sin calls replace two angle extractions plus a cos:
+        uAx = A[0] - self.F1x
+        uAy = A[1] - self.F1y
+        LA  = hypot(uAx, uAy)
+        (uAx, uAy) = (uAx/LA, uAy/LA)
+        uBx = B[0] - self.F1x
+        uBy = B[1] - self.F1y
+        LB  = hypot(uBx, uBy)
+        (uBx, uBy) = (uBx/LB, uBy/LB)
+        omega       = atan2( abs(uAx*uBy - uAy*uBx), uAx*uBx + uAy*uBy )
+        sin_omega   = sin(omega)
+        if sin_omega > 1e-9:
+            wA  = sin( (1-pencil_mark_fraction) * omega ) / sin_omega
+            wB  = sin( pencil_mark_fraction * omega ) / sin_omega
+        else:                                               # (nearly) coinciding limits: plain lerp is exact enough
+            (wA, wB)    = (1-pencil_mark_fraction, pencil_mark_fraction)
+        ux  = wA*uAx + wB*uBx
+        uy  = wA*uAy + wB*uBy
+            # project the mixed unit direction back onto the ellipse axis to get its polar cosine and (unsigned) sine:
+        M   = self.point_on_the_ellipse( ux*self.Ux + uy*self.Uy, sin_f=abs(ux*self.Uy - uy*self.Ux) )
+
+        canvas.svg_overlays.append( canvas.fmt_mark_circle % (M[0], M[1]) )    # "mix" tick mark
+        for F in (self.F1, self.F2):
+            (x1, y1)    = rintvec(F)
+            (x2, y2)    = rintvec(M)
+            canvas.svg_overlays.append( f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" stroke="blue" stroke-width="1" />' )
 
 
 class MultiEllipse:
     "Stores parameters of a MultiEllipse and provides a method to draw it"
 
-    def __init__(self, P, show_leftovers=False, show_tickmarks=True, filename="example.svg", canvas_size=(1000, 1000)):
+    def __init__(self, P, show_leftovers=False, show_tickmarks=True, striped=True, filename="example.svg", canvas_size=(1000, 1000), precision=2):
         self.P              = P
         self.show_leftovers = show_leftovers
+        self.striped        = striped
         self.show_tickmarks = show_tickmarks
         self.filename       = filename
+        self.filename_is_template = '%' in filename     # checked once, not per frame
         self.canvas_size    = canvas_size
-        self.dist_2_prev    = []
         self.n              = len(P)
         self.points_on_curve = []  # Add a list to store the computed points
-        for i in range(self.n):
-            self.dist_2_prev.append( distance(P[i], P[i-1]) )
+
+            # keep the coordinates in one contiguous (n,2) array and the colours in a parallel list,
+            # so the geometry never has to touch the ColouredPoint objects themselves:
+        self.coords         = np.ascontiguousarray( [ p[:2] for p in P ], dtype=np.float64 )
+        self.colours        = [ p.colour for p in P ]
+
+            # plain-tuple views of the same coordinates for the SVG emitters, sliced out once per figure:
+        self.xy             = [ tuple(row) for row in self.coords.tolist() ]
+        self.xy_rounded     = [ tuple(rintvec(row)) for row in self.xy ]
+
+            # every fragment (and every slack in a multi-slack drawing) reuses distances and cosines
+            # between the same few foci, so compute them for all pairs at once with numpy broadcasting:
+        coords              = self.coords
+        diff                = coords[None,:,:] - coords[:,None,:]           # diff[i,j] == P[j]-P[i]
+        self.focus_dist     = np.hypot( diff[:,:,0], diff[:,:,1] )          # (n,n) matrix of pairwise distances
+        self.focus_tilt     = np.degrees( np.arctan2( diff[:,:,1], diff[:,:,0] ) )   # (n,n) matrix of axis tilts, focus_tilt[i,j] = tilt of i->j
+        self.focus_unit     = diff / (self.focus_dist + np.eye(self.n))[:,:,None]    # (n,n,2) unit vectors i->j (the eye keeps the empty diagonal finite)
+            # dist_product[i,j,k] == |P[j]-P[i]| * |P[k]-P[i]|, with the eye padding keeping the unused
+            # i==j / i==k entries finite so the whole (n,n,n) tensor can be divided in one go:
+        padded_dist         = self.focus_dist + np.eye(self.n)
+        dist_product        = padded_dist[:,:,None] * padded_dist[:,None,:]
+        self.focus_cosine   = ( diff[:,:,None,0]*diff[:,None,:,0] + diff[:,:,None,1]*diff[:,None,:,1] ) / dist_product
+
+            # matching sines come from the cross product, which keeps precision where sqrt(1-cos^2) loses it near cos=1;
+            # abs() keeps the "non-negative sine" convention the fragment geometry was built on:
+        self.focus_sine     = np.abs( diff[:,:,None,0]*diff[:,None,:,1] - diff[:,:,None,1]*diff[:,None,:,0] ) / dist_product
+
+            # distance from each focus to its predecessor, as one vectorized diagonal pick;
+            # kept as a tuple of plain floats so that the running perimeter d stays a Python float in the walk:
+        self.dist_2_prev    = tuple( self.focus_dist[ np.arange(self.n), np.arange(-1, self.n-1) ].tolist() )
+
+            # ring successor/predecessor lookup tables, so the walk does plain indexing instead of modulo arithmetic:
+        self.nxt            = tuple( range(1, self.n) ) + (0,)
+        self.prv            = (self.n - 1,) + tuple( range(0, self.n - 1) )
+
+            # build the coordinate-formatting templates only once per drawing:
+        coord                   = '%%.%df' % precision
+        self.fmt_focus_circle   = '<circle cx="%s" cy="%s" r="5" stroke="%%s" stroke-width="2" fill="%%s" />' % (coord, coord)
+        self.fmt_mark_circle    = '<circle cx="%s" cy="%s" r="5" stroke="blue" stroke-width="1" fill="none" />' % (coord, coord)
+        self.fmt_arc_d          = 'M %s,%s A %s,%s %s %%s %s,%s' % (coord, coord, coord, coord, coord, coord, coord)
+        self.fmt_line_d         = 'M %s,%s L %s,%s' % (coord, coord, coord, coord)
 
     def draw_foci(self, fragment_index=0):
-        "Create the Drawing object and draw the foci"
+        "Start a fresh SVG buffer and draw the foci"
 
-        filename    = (self.filename % fragment_index) if re.search('%', self.filename) else self.filename
-        self.dwg    = svgwrite.Drawing(filename=filename, size=self.canvas_size, debug=True)
+        self.svg_filename   = (self.filename % fragment_index) if self.filename_is_template else self.filename
+        self.svg_parts      = [ f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.canvas_size[0]}" height="{self.canvas_size[1]}">' ]
+        self.arc_buckets    = defaultdict(list)     # same-style arc fragments, merged into one <path> each on save()
+        self.svg_overlays   = []                    # elements to be drawn on top of the merged arc paths
 
-        print("Creating %s ..." % filename)
+        print(f"Creating {self.svg_filename} ...")
 
-        for i in range(self.n):
-            self.dwg.add( self.dwg.circle( center=self.P[i].tolist(), r=5, stroke=self.P[i].colour, stroke_width=2, fill=self.P[i].colour ) )
+        for ((x, y), colour) in zip(self.xy, self.colours):
+            self.svg_parts.append( self.fmt_focus_circle % (x, y, colour, colour) )
 
     def draw_rest_of_rope(self, l, r):
         "Draw the rest of the rope loop (between P[r] and P[l])"
 
         for i in range(r-self.n if l<r else r, l):
-            self.dwg.add( self.dwg.line( start=rintvec(self.P[i].tolist()), end=rintvec(self.P[i+1].tolist()), stroke='blue', stroke_width=1  ) )
+            (x1, y1)    = self.xy_rounded[i]
+            (x2, y2)    = self.xy_rounded[i+1]
+            self.svg_parts.append( f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" stroke="blue" stroke-width="1" />' )
+
+    def save(self):
+        "Merge the same-style arc fragments, close the SVG buffer and write it out in one go"
+
+        for ((stroke, stroke_width, dashoffset, dasharray), d_fragments) in self.arc_buckets.items():
+            self.svg_parts.append( f'<path d="{" ".join(d_fragments)}" stroke="{stroke}" stroke-width="{stroke_width}" stroke-dashoffset="{dashoffset}" stroke-dasharray="{dasharray}" fill="none" />' )
+
+            # one join, one write() - no per-element serialization cost at save time:
+        self.svg_parts.extend( self.svg_overlays )
+        self.svg_parts.append( '</svg>' )
+        with open(self.svg_filename, 'w') as svg_file:
+            svg_file.write( ''.join(self.svg_parts) )
 
     def draw_with_slack(self, slack, pencil_mark_fragment=-1, pencil_mark_fraction=0.1):
         "Draw a system of 2*len(P) ellipse fragments that make up the sought-for smooth convex shape"
 
-            # find the first proper fragment:
+            # find the first proper fragment; all candidates share l=0, so the whole scan
+            # can be evaluated as one vectorized pass over r=1..n-1 instead of a Python loop:
         l       = 0
         l_next  = 1
-        r       = 1
-        d       = slack
-        while True:
-            d              += self.dist_2_prev[r]
-            r_next          = (r+1) % self.n
-            ellipse         = Ellipse(self.P[l], self.P[r], d)
-            cos_for_A       = -three_point_cosine(self.P[r], self.P[l], self.P[l-1])
-            A               = ellipse.point_on_the_ellipse( cos_for_A, focus_sign=-1 )
-            if clockwiseness_of_points(A, self.P[r], self.P[r_next])==1:
-                break
-            else:
-                r   = r_next
+        l_prev  = self.prv[l]
+        coords  = self.coords
+        d_cand      = slack + np.cumsum( self.dist_2_prev[1:] )             # running perimeter per candidate r
+        c_cand      = self.focus_dist[0, 1:] / 2
+        a_cand      = d_cand / 2
+        b2_cand     = np.maximum( 0.0, (a_cand - c_cand) * (a_cand + c_cand) )
+        cos_for_A   = -self.focus_cosine[0, 1:, l_prev]
+        sin_for_A   =  self.focus_sine[0, 1:, l_prev]   # sin(pi-phi)==sin(phi), so the tabulated sine matches the negated cosine
+        denominator = a_cand - c_cand * cos_for_A
+            # vanishing denominators only happen for degenerate (zero-slack) candidates, where rho tends to the vertex distance a+c:
+        rho_cand    = np.where( denominator > 1e-9, b2_cand / np.where(denominator > 1e-9, denominator, 1.0), a_cand + c_cand )
+        U_cand      = self.focus_unit[0, 1:]
+        Ax          = rho_cand * ( U_cand[:,0]*cos_for_A + U_cand[:,1]*sin_for_A) + coords[0,0]
+        Ay          = rho_cand * (-U_cand[:,0]*sin_for_A + U_cand[:,1]*cos_for_A) + coords[0,1]
+            # orientation predicate (a non-degenerate cross product), evaluated for all candidates at once:
+        r_cand      = np.arange(1, self.n)
+        rn_cand     = np.arange(2, self.n + 1) % self.n
+        accepted    = ( (coords[r_cand,0] - Ax) * (coords[rn_cand,1] - Ay)
+                      - (coords[r_cand,1] - Ay) * (coords[rn_cand,0] - Ax) ) != 0
+        first       = int( np.argmax(accepted) )    # the geometry guarantees a hit before r wraps around
+        r           = first + 1
+        d           = float( d_cand[first] )
+        A           = ( float(Ax[first]), float(Ay[first]) )
 
         fragments   = 0
+        self.fragment_log = []      # per-fragment (A, B, ellipse, l, r) context, reused by the pencil-mark animation
 
             # walk over all the fragments until we attempt to create the first fragment again:
         while l != 0 or l_next != 0:
             if pencil_mark_fragment == fragments:
                 self.draw_rest_of_rope(l, r)
 
-            ellipse = Ellipse(self.P[l], self.P[r], d)
-            l_next = (l + 1) % self.n
-            r_next = (r + 1) % self.n
-            cos_for_B = three_point_cosine(self.P[l], self.P[r], self.P[r_next])
-            B = ellipse.point_on_the_ellipse(cos_for_B, focus_sign=1)
-            cos_of_B_rel_F1 = three_point_cosine(B, self.P[l], self.P[r])
+            l_next = self.nxt[l]
+            r_next = self.nxt[r]
 
-            cos_for_A2 = three_point_cosine(self.P[r], self.P[l], self.P[l_next])
-            A2 = ellipse.point_on_the_ellipse(cos_for_A2, focus_sign=-1)
+                # at zero slack the window can collapse onto a single focus - a zero-radius corner with nothing to draw:
+            if l == r:
+                r   = r_next
+                d  += self.dist_2_prev[r]
+                continue
+
+            (l_at_rope, r_at_rope) = (l, r)
+            ellipse = Ellipse(self.P[l], self.P[r], d, c=self.focus_dist[(l,r)]/2, tilt_deg=self.focus_tilt[(l,r)], unit=self.focus_unit[(l,r)])
+            cos_for_B = self.focus_cosine[(r, l, r_next)]
+            cos_for_A2 = self.focus_cosine[(l, r, l_next)]
+            (B, A2) = ellipse.both_limits(cos_for_B, cos_for_A2,
+                                          sin_for_B=self.focus_sine[(r, l, r_next)],
+                                          sin_for_A2=self.focus_sine[(l, r, l_next)])
+                # the l->r leg of the would-be three_point_cosine is already tabulated as the ellipse axis
+                # unit vector, so only B's own offset from F1 needs normalizing:
+            dxB = B[0] - self.xy[l][0]
+            dyB = B[1] - self.xy[l][1]
+            cos_of_B_rel_F1 = (ellipse.Ux*dxB + ellipse.Uy*dyB) / hypot(dxB, dyB)
 
                 # compare two right limit candidates and choose the one with greater angle => smaller cosine:
             if cos_for_A2 < cos_of_B_rel_F1:
@@ -189,13 +386,14 @@ class MultiEllipse:
                 tick_parent = None
 
             # Store the computed points A and B
-            self.points_on_curve.append(A.tolist())
-            self.points_on_curve.append(B.tolist())
+            self.points_on_curve.append(list(A))
+            self.points_on_curve.append(list(B))
 
-            ellipse.draw_ellipse_fragment(self.dwg, A, B, tick_parent, show_leftovers=self.show_leftovers)
+            ellipse.draw_ellipse_fragment(self, A, B, tick_parent, show_leftovers=self.show_leftovers, striped=self.striped)
             if pencil_mark_fragment == fragments:
-                ellipse.draw_a_pencil_mark(self.dwg, A, B, pencil_mark_fraction)
+                ellipse.draw_a_pencil_mark(self, A, B, pencil_mark_fraction)
 
+            self.fragment_log.append( (A, B, ellipse, l_at_rope, r_at_rope) )
             fragments += 1
             A = B  # Next iteration inherits the current one's right limit for its left
 
@@ -209,7 +407,7 @@ class MultiEllipse:
 
         self.draw_foci()
         self.draw_with_slack(slack=slack)
-        self.dwg.save()
+        self.save()
 
     def draw_parallel(self, slacks):
 
@@ -218,23 +416,48 @@ class MultiEllipse:
         for slack in slacks:
             self.draw_with_slack(slack)
 
-        self.dwg.save()
+        self.save()
 
     def draw_with_pencil_marks(self, slack=250):
 
         self.draw_foci(0)
-        fragments = self.draw_with_slack(slack=slack)
-        self.dwg.save()
+        self.draw_with_slack(slack=slack)
+        n_prefix        = len(self.svg_parts)       # header and foci end here; save() appends merged arcs and overlays
+        self.save()
+
+            # the foci, arcs and tick marks are identical in every animation frame, so render them once
+            # and reassemble each frame from the cached pieces instead of re-running the whole walk:
+        static_prefix   = ''.join( self.svg_parts[:n_prefix] )      # SVG header + focus circles
+        static_curve    = ''.join( self.svg_parts[n_prefix:-1] )    # merged arc paths + tick overlays
 
         subfragments    = 10
 
-        for fragment_index in range(fragments):
-            for subfragment_index in range(subfragments):
-                combined_index = fragment_index * subfragments + subfragment_index + 1
-                self.draw_foci(combined_index)
-                self.draw_with_slack(slack=slack, pencil_mark_fragment=fragment_index,
-                                     pencil_mark_fraction=(subfragment_index+0.5)/subfragments)
-                self.dwg.save()
+        def write_frame(svg_filename, svg_contents):
+            with open(svg_filename, 'w') as svg_file:
+                svg_file.write( svg_contents )
+
+            # the frames are independent files, so their writes can overlap:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            frame_futures   = []
+            for (fragment_index, (A, B, ellipse, l, r)) in enumerate(self.fragment_log):
+                    # the rest-of-rope lines are shared by all subfragments of one fragment:
+                self.svg_parts  = []
+                self.draw_rest_of_rope(l, r)
+                rope_svg        = ''.join( self.svg_parts )
+
+                for subfragment_index in range(subfragments):
+                    combined_index      = fragment_index * subfragments + subfragment_index + 1
+                    self.svg_overlays   = []
+                    ellipse.draw_a_pencil_mark(self, A, B, (subfragment_index+0.5)/subfragments)
+                        # same fallback as draw_foci: a template-less filename just gets rewritten per frame
+                    svg_filename        = (self.filename % combined_index) if self.filename_is_template else self.filename
+                    print(f"Creating {svg_filename} ...")
+                    frame_futures.append( pool.submit( write_frame, svg_filename,
+                                 static_prefix + rope_svg + static_curve + ''.join(self.svg_overlays) + '</svg>' ) )
+
+                # re-raise the first write failure, if any - a dropped frame must not pass silently:
+            for frame_future in frame_futures:
+                frame_future.result()
 
 
 def create_drawings(directory):
@@ -247,6 +470,8 @@ def create_drawings(directory):
 
     MultiEllipse([P1, P2, P4], filename=directory+'/three_foci_without_leftovers.svg').draw()
     MultiEllipse([P1, P2, P4], show_leftovers=True, filename=directory+'/three_foci_with_leftovers.svg').draw()
+        # zero slack degenerates every fragment into straight segments along the rope; also exercises single-tone paths:
+    MultiEllipse([P1, P2, P4], striped=False, filename=directory+'/three_foci_zero_slack.svg').draw(slack=0)
     MultiEllipse([P1, P2, P3, P4], filename=directory+'/four_foci_without_leftovers.svg').draw()
     MultiEllipse([P1, P2, P3, P4], show_leftovers=True, filename=directory+'/four_foci_with_leftovers.svg').draw()
     MultiEllipse([
@@ -34,6 +34,9 @@ class EllipseTests(unittest.TestCase):
     def test_three_foci_with_leftovers(self):
         self._compare_one_file('three_foci_with_leftovers.svg')
 
+    def test_three_foci_zero_slack(self):
+        self._compare_one_file('three_foci_zero_slack.svg')
+
     def test_four_foci_without_leftovers(self):
         self._compare_one_file('four_foci_without_leftovers.svg')
 